@@ -1,4 +1,5 @@
-from fastapi import FastAPI, Query, Path, HTTPException
+from fastapi import FastAPI, Query, Path, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 import pandas as pd
@@ -6,7 +7,12 @@ import numpy as np
 import plotly.graph_objects as go
 import os
 import sys
+import glob
+import gzip
 import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
 
 
@@ -17,7 +23,8 @@ from typing import Optional
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 SRC_DIR = os.path.join(THIS_DIR, 'src')
 sys.path.insert(0, SRC_DIR)
-from rel_data import df_maker
+from rel_data_pl import load_csv
+from agg_kernels import groupby_mean_std
 
 
 
@@ -44,52 +51,219 @@ app.mount("/static", StaticFiles(directory=os.path.join(THIS_DIR, "static")), na
 
 
 
-AVAILABLE_TICKERS = ['TUZ5', 'FVZ5', 'TYZ5', 'USZ25']
+# Comma-separated symbols, each loaded from data/<symbol>.csv
+AVAILABLE_TICKERS = [
+    t.strip().upper()
+    for t in os.environ.get('BOND_TICKERS', 'TUZ5,FVZ5,TYZ5,USZ25').split(',')
+    if t.strip()
+]
 ticker_data = {}
+timeplot_labels = {}
+agg_cache = {}
+day_bounds = {}
+weekday_masks = {}
+data_version = 0
+
+
+
+
+def summarize_agg(frame, labels):
+    """Mean/SD curves over TimePlot plus overall stats for an aggregation frame"""
+    # Factorize once (sorted) and run the compiled single-pass kernel
+    codes, uniques = pd.factorize(frame['TimePlot'].values, sort=True)
+    # Aggregate the float32 prices in float64
+    prices = frame['Relative Price'].astype(np.float64)
+    mean, std = groupby_mean_std(codes, prices.to_numpy(), len(uniques))
+    return {
+        'x': pd.DatetimeIndex(uniques).map(labels).tolist(),
+        'mean': mean,
+        'std': std,
+        'avg': prices.mean(),
+        'sd': prices.std()
+    }
+
+
+
+
+def build_agg_cache(df, labels):
+    """Precompute the 'total' and per-weekday aggregations, which never change after load"""
+    cache = {'total': summarize_agg(df, labels)}
+    for weekday, group in df.groupby('WeekDay', observed=True):
+        cache[('weekday', weekday)] = summarize_agg(group, labels)
+    return cache
+
+
+
+
+def build_day_bounds(df):
+    """Map each DayStr to its (start, stop) row positions in a DayStr-sorted frame"""
+    day_values = df['DayStr'].to_numpy()
+    days = pd.unique(day_values)
+    starts = np.searchsorted(day_values, days, side='left')
+    stops = np.searchsorted(day_values, days, side='right')
+    return dict(zip(days, zip(starts, stops)))
+
+
+
+
+def build_weekday_masks(df):
+    """Boolean row mask per weekday name, built from the WeekDay category codes"""
+    codes = df['WeekDay'].cat.codes.to_numpy()
+    return {weekday: codes == i for i, weekday in enumerate(df['WeekDay'].cat.categories)}
+
+
+
+
+# Version of the frame layout _load_ticker caches (columns, dtypes, row order). Bump it
+# whenever df_maker or the derived columns change so older caches are rebuilt
+PARQUET_CACHE_VERSION = 2
+
+
+def _load_ticker(ticker):
+    """Load one processed ticker frame, using data/<ticker>.v<N>_<mtime>_<size>.parquet as a
+    cache of the CSV.
+    
+    Returns (df, parquet_path) where parquet_path is where the frame should be cached once it
+    has registered, or None when it was read from the cache.
+    """
+    csv_path = os.path.join(THIS_DIR, 'data', f'{ticker.lower()}.csv')
+    if not os.path.exists(csv_path):
+        print(f"⚠️  File not found: {csv_path}")
+        return None, None
+    
+    # Keyed on the CSV's mtime and size (as notebook/app.py does), so any replacement of the
+    # CSV, even with an older timestamp, misses the cache and forces a rebuild
+    stat = os.stat(csv_path)
+    parquet_path = os.path.join(
+        THIS_DIR, 'data',
+        f'{ticker.lower()}.v{PARQUET_CACHE_VERSION}_{stat.st_mtime_ns}_{stat.st_size}.parquet'
+    )
+    
+    if os.path.exists(parquet_path):
+        print(f"Loading {ticker} from {parquet_path}...")
+        try:
+            return pd.read_parquet(parquet_path), None
+        except Exception as e:
+            # A damaged cache must not take the ticker offline; drop it and rebuild from the CSV
+            print(f"⚠️  Could not read parquet cache {parquet_path}, rebuilding: {e}")
+            try:
+                os.remove(parquet_path)
+            except OSError:
+                pass
+    
+    print(f"Loading {ticker} from {csv_path}...")
+    df = load_csv(csv_path)
+    
+    # Build shifted datetime for plotting straight from the time-of-day offset
+    df['TimeDT'] = pd.Timestamp('2000-01-01') + df['TimeOfDay']
+    # Times before the 18:00 session open plot on the following day
+    df['TimePlot'] = df['TimeDT'] + pd.to_timedelta(
+        (df['TimeDT'].dt.hour < 18).astype('int64'), unit='D'
+    )
+    
+    # Pre-format plot timestamps once so requests never call strftime. Only the
+    # unique intraday timestamps are formatted, then mapped back to every row
+    codes, unique_times = pd.factorize(df['TimePlot'], sort=True)
+    unique_strs = unique_times.strftime('%Y-%m-%d %H:%M:%S')
+    df['TimePlotStr'] = np.asarray(pd.Categorical.from_codes(codes, unique_strs), dtype=object)
+    
+    # Label columns
+    df['DayStr'] = df['TradingDay'].dt.strftime('%Y-%m-%d')
+    df['WeekDay'] = df['TradingDay'].dt.day_name()
+    df['DayLabel'] = df['DayStr'] + ' - ' + df['WeekDay']
+    
+    # df_maker already sorts by trading day then time, so each trading day is a
+    # contiguous row slice in DayStr order
+    
+    # Categorical labels so isin/groupby work on integer codes
+    for col in ('DayStr', 'WeekDay', 'DayLabel'):
+        df[col] = df[col].astype('category')
+    # Relative prices are display-only; float32 halves the column's memory traffic
+    df['Relative Price'] = pd.to_numeric(df['Relative Price'], downcast='float')
+    
+    return df, parquet_path
+
+
+
+
+def _write_parquet_cache(ticker, df, parquet_path):
+    """Write a registered ticker frame to its parquet cache and drop the ticker's older caches"""
+    data_dir = os.path.dirname(parquet_path)
+    # Write to a temp file in the same directory and rename it into place, so a crash or a
+    # concurrent worker never leaves a partial file at parquet_path
+    tmp_path = f'{parquet_path}.{os.getpid()}.tmp'
+    try:
+        df.to_parquet(tmp_path, compression='zstd')
+        os.replace(tmp_path, parquet_path)
+    except Exception as e:
+        print(f"⚠️  Could not write parquet cache {parquet_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    else:
+        # Drop caches left by other versions or CSV edits (including the unversioned name)
+        stale = glob.glob(os.path.join(data_dir, f'{ticker.lower()}.parquet'))
+        stale += glob.glob(os.path.join(data_dir, f'{ticker.lower()}.v*.parquet'))
+        for path in stale:
+            if path != parquet_path:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"⚠️  Could not remove stale cache {path}: {e}")
+
+
+
+
+def register_ticker(ticker, df):
+    """Store a loaded ticker frame and build its lookup tables"""
+    global data_version
+    labels = df.drop_duplicates('TimePlot')
+    timeplot_labels[ticker] = dict(zip(labels['TimePlot'], labels['TimePlotStr']))
+    day_bounds[ticker] = build_day_bounds(df)
+    weekday_masks[ticker] = build_weekday_masks(df)
+    agg_cache[ticker] = build_agg_cache(df, timeplot_labels[ticker])
+    ticker_data[ticker] = df
+    # New data version so cached chart responses from older data are not reused
+    data_version += 1
+
+
+
+
+def _load_one_ticker(ticker):
+    """Load a single ticker for the startup pool, returning (ticker, None, None) on failure"""
+    try:
+        return (ticker, *_load_ticker(ticker))
+    except Exception as e:
+        print(f"✗ Error loading {ticker}: {e}")
+        import traceback
+        traceback.print_exc()
+        return ticker, None, None
 
 
 
 
 def load_all_tickers():
     """Load all ticker data on startup"""
-    global ticker_data
+    # Tickers are independent and pandas I/O releases the GIL, so load them in parallel
+    with ThreadPoolExecutor(max_workers=max(1, len(AVAILABLE_TICKERS))) as executor:
+        results = list(executor.map(_load_one_ticker, AVAILABLE_TICKERS))
     
-    for ticker in AVAILABLE_TICKERS:
+    for ticker, df, parquet_path in results:
+        if df is None:
+            continue
         try:
-            # Try to load from file
-            file_path = os.path.join(THIS_DIR, 'data', f'{ticker.lower()}.csv')
-            
-            if not os.path.exists(file_path):
-                print(f"⚠️  File not found: {file_path}")
-                continue
-            
-            print(f"Loading {ticker} from {file_path}...")
-            # Add encoding parameter to handle different CSV encodings
-            data = pd.read_csv(file_path, encoding='utf-8')
-            df = df_maker(data)
-            
-            # Build shifted datetime for plotting
-            df['TimeDT'] = pd.to_datetime(
-                '2000-01-01 ' + df['TimeOfDay'].astype(str),
-                format='%Y-%m-%d %H:%M:%S'
-            )
-            cutoff = pd.to_datetime('18:00:00', format='%H:%M:%S').time()
-            df['TimePlot'] = df['TimeDT'].apply(
-                lambda ts: ts + pd.Timedelta(days=1) if ts.time() < cutoff else ts
-            )
-            
-            # Label columns
-            df['DayStr'] = df['TradingDay'].dt.strftime('%Y-%m-%d')
-            df['WeekDay'] = df['TradingDay'].dt.day_name()
-            df['DayLabel'] = df['DayStr'] + ' - ' + df['WeekDay']
-            
-            ticker_data[ticker] = df
+            register_ticker(ticker, df)
             print(f"✓ {ticker}: {len(df)} records, {df['DayStr'].nunique()} trading days")
             
         except Exception as e:
             print(f"✗ Error loading {ticker}: {e}")
             import traceback
             traceback.print_exc()
+            continue
+        # Only cache frames that registered, so a bad build is retried from the CSV next start
+        if parquet_path is not None:
+            _write_parquet_cache(ticker, df, parquet_path)
 
 
 
@@ -100,68 +274,20 @@ load_all_tickers()
 
 
 
-# If no tickers loaded, load default TUZ5 data for backward compatibility
 if not ticker_data:
-    print("⚠️  No ticker data loaded, trying default TUZ5.csv...")
-    try:
-        data = pd.read_csv(os.path.join(THIS_DIR, 'data', 'tuz5.csv'), encoding='utf-8')
-        df = df_maker(data)
-        
-        df['TimeDT'] = pd.to_datetime(
-            '2000-01-01 ' + df['TimeOfDay'].astype(str),
-            format='%Y-%m-%d %H:%M:%S'
-        )
-        cutoff = pd.to_datetime('18:00:00', format='%H:%M:%S').time()
-        df['TimePlot'] = df['TimeDT'].apply(
-            lambda ts: ts + pd.Timedelta(days=1) if ts.time() < cutoff else ts
-        )
-        
-        df['DayStr'] = df['TradingDay'].dt.strftime('%Y-%m-%d')
-        df['WeekDay'] = df['TradingDay'].dt.day_name()
-        df['DayLabel'] = df['DayStr'] + ' - ' + df['WeekDay']
-        
-        ticker_data['TUZ5'] = df
-        print(f"✓ Loaded default TUZ5 data: {len(df)} records")
-    except Exception as e:
-        print(f"✗ Critical error loading default data: {e}")
-        import traceback
-        traceback.print_exc()
+    print(f"⚠️  No ticker data loaded for BOND_TICKERS={AVAILABLE_TICKERS}")
 
 
 
 
 
 # ============================================================================
-# UTILITY FUNCTIONS - NaN Handling
+# UTILITY FUNCTIONS
 # ============================================================================
 
 
 
 
-def convert_nan_to_none(obj):
-    """Recursively convert NaN and Infinity values to None for JSON serialization"""
-    if isinstance(obj, dict):
-        return {k: convert_nan_to_none(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_nan_to_none(item) for item in obj]
-    elif isinstance(obj, float):
-        if np.isnan(obj) or np.isinf(obj):
-            return None
-        return obj
-    elif isinstance(obj, np.floating):
-        if np.isnan(obj) or np.isinf(obj):
-            return None
-        return float(obj)
-    elif isinstance(obj, (np.integer, np.int64, np.int32)):
-        return int(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    return obj
-
-
-
-
-
 def get_ticker_data(ticker):
     """Get dataframe for a specific ticker"""
     ticker_upper = ticker.upper()
@@ -260,32 +386,77 @@ async def get_trading_days(ticker: Optional[str] = Query(None)):
 
 
 
+def load_html_page(name):
+    """Read a template once and keep its raw and gzip-compressed bytes (None if missing)"""
+    html_path = os.path.join(THIS_DIR, "templates", name)
+    if not os.path.exists(html_path):
+        print(f"⚠️  Template not found: {html_path}")
+        return None
+    with open(html_path, "r", encoding="utf-8") as f:
+        raw = f.read().encode("utf-8")
+    return {"identity": raw, "gzip": gzip.compress(raw)}
+
+
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip, honouring q-values and '*'"""
+    qualities = {}
+    for token in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in token.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding.lower()] = q
+    # An explicit gzip entry wins over the wildcard
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+
+
+def html_page_response(page, request):
+    """Serve a preloaded page, gzip-encoded when the client accepts it"""
+    headers = {"Vary": "Accept-Encoding"}
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return HTMLResponse(content=page["gzip"], headers=headers)
+    return HTMLResponse(content=page["identity"], headers=headers)
+
+
+
+
+# Templates are static, so read and compress them once at startup
+landing_page = load_html_page("landing.html")
+dashboard_page = load_html_page("index.html")
+
+
+
+
 @app.get("/", response_class=HTMLResponse)
-async def root():
+async def root(request: Request):
     """Serve the landing page"""
-    html_path = os.path.join(THIS_DIR, "templates", "landing.html")
-    if not os.path.exists(html_path):
+    if landing_page is None:
         return "<h1>Landing page not found</h1>"
-    with open(html_path, "r", encoding="utf-8") as f:
-        return f.read()
+    return html_page_response(landing_page, request)
 
 
 
 
 
 @app.get("/dashboard", response_class=HTMLResponse)
-async def dashboard():
+async def dashboard(request: Request):
     """Serve the dashboard - uses TUZ5 data by default"""
-    html_path = os.path.join(THIS_DIR, "templates", "index.html")
-    print(f"Dashboard route called, looking for: {html_path}")
-    print(f"File exists: {os.path.exists(html_path)}")
-    
-    if not os.path.exists(html_path):
+    if dashboard_page is None:
+        html_path = os.path.join(THIS_DIR, "templates", "index.html")
         return "<h1>Dashboard not found at " + html_path + "</h1>"
-    
-    with open(html_path, "r", encoding="utf-8") as f:
-        content = f.read()
-    return content
+    return html_page_response(dashboard_page, request)
 
 
 
@@ -298,6 +469,153 @@ async def dashboard():
 
 
 
+# Static Plotly layout shared by every chart response
+CHART_LAYOUT = {
+    'template': 'plotly_white',
+    'xaxis': {
+        'tickformat': '%H:%M',
+        'range': ['2000-01-01 18:00:00', '2000-01-02 17:59:00'],
+        'title': 'Time (18:00–17:59)'
+    },
+    'yaxis': {'title': 'Relative Price'},
+    'legend': {'title': {'text': 'Trading Day'}},
+    'hovermode': 'x unified',
+    'paper_bgcolor': '#ffffff',
+    'plot_bgcolor': '#ffffff',
+    'font': {'color': '#000000'}
+}
+
+
+
+
+@lru_cache(maxsize=256)
+def _compute_chart_bytes(version, ticker, selection_mode, start_date, end_date, weekdays, agg_mode):
+    """
+    Build the chart payload for one query and serialize it with orjson.
+    Cached per query; version changes whenever ticker data is (re)loaded.
+    """
+    df = get_ticker_data(ticker)
+    filtered = df
+    
+    # Filter based on selection mode
+    if selection_mode == 'calendar':
+        if end_date is None:
+            end_date = start_date
+        
+        selected_date_range = pd.date_range(start=start_date, end=end_date, freq='D')
+        selected_date_strs = selected_date_range.strftime('%Y-%m-%d').tolist()
+        # Frame is sorted by DayStr, so a date range is one contiguous slice
+        bounds = day_bounds[ticker.upper()]
+        present = [bounds[d] for d in selected_date_strs if d in bounds]
+        filtered = df.iloc[present[0][0]:present[-1][1]] if present else df.iloc[0:0]
+        mode_label = "Calendar"
+        
+    elif selection_mode == 'weekday':
+        selected_weekdays = list(weekdays)
+        # OR together the precomputed masks; unknown names match nothing, like isin
+        masks = weekday_masks[ticker.upper()]
+        mask = np.zeros(len(df), dtype=bool)
+        for weekday in selected_weekdays:
+            if weekday in masks:
+                mask |= masks[weekday]
+        filtered = df.loc[mask]
+        mode_label = f"Weekday ({', '.join(selected_weekdays)})"
+    
+    
+    if filtered.empty:
+        return orjson.dumps({
+            "data": {},
+            "stats": {"description": "No data available for selected criteria"}
+        })
+    
+    # Build traces for each day in a single groupby pass
+    selected_days = []
+    traces = []
+    for label, day_df in filtered.groupby('DayLabel', sort=False, observed=True):
+        selected_days.append(label)
+        
+        # Handle price data - use actual price if available, otherwise relative price
+        actual_prices = day_df['Relative Price'].to_numpy(dtype=np.float64)
+        if 'Price' in day_df.columns:
+            prices = day_df['Price'].to_numpy(dtype=np.float64)
+            actual_prices = np.where(np.isnan(prices) | (prices == 0), actual_prices, prices)
+        
+        traces.append({
+            'x': day_df['TimePlotStr'].to_numpy(copy=False).tolist(),
+            'y': day_df['Relative Price'].to_numpy(copy=False).tolist(),
+            'customdata': day_df['DayStr'].to_numpy(copy=False).tolist(),
+            'actual_prices': actual_prices,
+            'type': 'scatter',
+            'mode': 'lines',
+            'name': label,
+            'opacity': 0.7
+        })
+    
+    # Add mean/SD aggregation if requested
+    mean_traces = []
+    if agg_mode != 'none':
+        agg, mean_label = get_agg_summary(ticker.upper(), filtered, agg_mode, selected_days)
+        
+        if agg is not None:
+            # Mean trace
+            mean_traces.append({
+                'x': agg['x'],
+                'y': agg['mean'],
+                'type': 'scatter',
+                'mode': 'lines',
+                'name': f'{mean_label}',
+                'line': {'color': 'black', 'width': 3, 'dash': 'dot'}
+            })
+            
+            # +1 SD
+            mean_traces.append({
+                'x': agg['x'],
+                'y': agg['mean'] + agg['std'],
+                'type': 'scatter',
+                'mode': 'lines',
+                'line': {'width': 0},
+                'showlegend': False
+            })
+            
+            # -1 SD with fill
+            mean_traces.append({
+                'x': agg['x'],
+                'y': agg['mean'] - agg['std'],
+                'type': 'scatter',
+                'mode': 'lines',
+                'fill': 'tonexty',
+                'line': {'width': 0, 'color': 'gray'},
+                'name': f'{mean_label} ±1SD',
+                'opacity': 0.3
+            })
+    
+    # Calculate statistics (reuses agg from the traces above)
+    if agg_mode != 'none':
+        if agg is not None:
+            sel_mean = agg['avg']
+            sel_sd = agg['sd']
+            desc = (f"Mode: {agg_mode.title()} | Selection: {mode_label} | Days: {len(selected_days)} | "
+                    f"Avg Relative Price: {sel_mean:.4f} | SD: {sel_sd:.4f}")
+        else:
+            desc = f"Selected {len(selected_days)} day(s)"
+    else:
+        desc = f"Showing {len(selected_days)} individual day(s) — Selection: {mode_label}"
+    
+    result = {
+        "ticker": ticker,
+        "data": {
+            "traces": traces + mean_traces,
+            "layout": CHART_LAYOUT
+        },
+        "stats": {"description": desc}
+    }
+    
+    # orjson writes NaN/Infinity as null and serializes numpy arrays natively
+    return orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+
+
 @app.get("/api/chart-data")
 async def get_chart_data(
     selection_mode: str = Query(..., description="'calendar' or 'weekday'"),
@@ -314,142 +632,14 @@ async def get_chart_data(
         # Default to TUZ5 if not specified
         if not ticker:
             ticker = 'TUZ5'
+        weekdays_tuple = tuple(weekdays.split(',')) if weekdays else ()
         
-        df = get_ticker_data(ticker)
-        filtered = df.copy()
-        
-        # Filter based on selection mode
-        if selection_mode == 'calendar':
-            if end_date is None:
-                end_date = start_date
-            
-            selected_date_range = pd.date_range(start=start_date, end=end_date, freq='D')
-            selected_date_strs = selected_date_range.strftime('%Y-%m-%d').tolist()
-            mask = filtered['DayStr'].isin(selected_date_strs)
-            filtered = filtered.loc[mask]
-            mode_label = "Calendar"
-            
-        elif selection_mode == 'weekday':
-            selected_weekdays = weekdays.split(',') if weekdays else []
-            mask = filtered['WeekDay'].isin(selected_weekdays)
-            filtered = filtered.loc[mask]
-            mode_label = f"Weekday ({', '.join(selected_weekdays)})"
-        
-        filtered = filtered.sort_values('TimePlot')
-        
-        if filtered.empty:
-            return {
-                "data": {},
-                "stats": {"description": "No data available for selected criteria"}
-            }
-        
-        # Get unique day labels
-        selected_days = filtered['DayLabel'].unique().tolist()
-        
-        # Build traces for each day
-        traces = []
-        for label in selected_days:
-            day_df = filtered.query('DayLabel == @label')
-            
-            # Handle price data - use actual price if available, otherwise relative price
-            actual_prices = []
-            for idx, row in day_df.iterrows():
-                if 'Price' in day_df.columns and pd.notna(row.get('Price')) and row.get('Price') != 0:
-                    actual_prices.append(float(row['Price']))
-                else:
-                    actual_prices.append(float(row['Relative Price']))
-            
-            traces.append({
-                'x': day_df['TimePlot'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist(),
-                'y': day_df['Relative Price'].tolist(),
-                'customdata': day_df['DayStr'].tolist(),
-                'actual_prices': actual_prices,
-                'type': 'scatter',
-                'mode': 'lines',
-                'name': label,
-                'opacity': 0.7
-            })
-        
-        # Add mean/SD aggregation if requested
-        mean_traces = []
-        if agg_mode != 'none':
-            agg_df, mean_label = get_agg_df(filtered, agg_mode, selected_days, df)
-            
-            if agg_df is not None and not agg_df.empty:
-                mean_curve = agg_df.groupby('TimePlot')['Relative Price'].mean().sort_index()
-                sd_curve = agg_df.groupby('TimePlot')['Relative Price'].std().sort_index()
-                
-                # Mean trace
-                mean_traces.append({
-                    'x': mean_curve.index.strftime('%Y-%m-%d %H:%M:%S').tolist(),
-                    'y': mean_curve.values.tolist(),
-                    'type': 'scatter',
-                    'mode': 'lines',
-                    'name': f'{mean_label}',
-                    'line': {'color': 'black', 'width': 3, 'dash': 'dot'}
-                })
-                
-                # +1 SD
-                mean_traces.append({
-                    'x': sd_curve.index.strftime('%Y-%m-%d %H:%M:%S').tolist(),
-                    'y': (mean_curve.values + sd_curve.values).tolist(),
-                    'type': 'scatter',
-                    'mode': 'lines',
-                    'line': {'width': 0},
-                    'showlegend': False
-                })
-                
-                # -1 SD with fill
-                mean_traces.append({
-                    'x': sd_curve.index.strftime('%Y-%m-%d %H:%M:%S').tolist(),
-                    'y': (mean_curve.values - sd_curve.values).tolist(),
-                    'type': 'scatter',
-                    'mode': 'lines',
-                    'fill': 'tonexty',
-                    'line': {'width': 0, 'color': 'gray'},
-                    'name': f'{mean_label} ±1SD',
-                    'opacity': 0.3
-                })
-        
-        # Calculate statistics
-        if agg_mode != 'none':
-            agg_df, _ = get_agg_df(filtered, agg_mode, selected_days, df)
-            if agg_df is not None and not agg_df.empty:
-                sel_mean = agg_df['Relative Price'].mean()
-                sel_sd = agg_df['Relative Price'].std()
-                desc = (f"Mode: {agg_mode.title()} | Selection: {mode_label} | Days: {len(selected_days)} | "
-                        f"Avg Relative Price: {sel_mean:.4f} | SD: {sel_sd:.4f}")
-            else:
-                desc = f"Selected {len(selected_days)} day(s)"
-        else:
-            desc = f"Showing {len(selected_days)} individual day(s) — Selection: {mode_label}"
-        
-        result = {
-            "ticker": ticker,
-            "data": {
-                "traces": traces + mean_traces,
-                "layout": {
-                    'template': 'plotly_white',
-                    'xaxis': {
-                        'tickformat': '%H:%M',
-                        'range': ['2000-01-01 18:00:00', '2000-01-02 17:59:00'],
-                        'title': 'Time (18:00–17:59)'
-                    },
-                    'yaxis': {'title': 'Relative Price'},
-                    'legend': {'title': {'text': 'Trading Day'}},
-                    'hovermode': 'x unified',
-                    'paper_bgcolor': '#ffffff',
-                    'plot_bgcolor': '#ffffff',
-                    'font': {'color': '#000000'}
-                }
-            },
-            "stats": {"description": desc}
-        }
-        
-        # Convert NaN/Infinity values to None before returning
-        result = convert_nan_to_none(result)
-        
-        return result
+        # Identical queries are served from the response cache
+        content = await run_in_threadpool(
+            _compute_chart_bytes, data_version, ticker, selection_mode,
+            start_date, end_date, weekdays_tuple, agg_mode
+        )
+        return Response(content=content, media_type="application/json")
     
     except Exception as e:
         print(f"ERROR: {str(e)}")
@@ -471,22 +661,22 @@ async def get_chart_data(
 
 
 
-def get_agg_df(filtered, agg_mode, selected_days, full_df):
-    """Helper function to get aggregation dataframe"""
+def get_agg_summary(ticker, filtered, agg_mode, selected_days):
+    """Helper function to get the aggregation summary; only 'selected' is computed live"""
     if agg_mode == 'total':
-        agg_df = full_df.copy()
+        agg = agg_cache[ticker]['total']
         label = 'Total Mean'
     elif agg_mode == 'weekday' and len(selected_days) == 1:
         weekday = filtered['WeekDay'].iloc[0]
-        agg_df = full_df[full_df['WeekDay'] == weekday].copy()
+        agg = agg_cache[ticker][('weekday', weekday)]
         label = f'{weekday} Mean'
     elif agg_mode == 'selected':
-        agg_df = filtered.copy()
+        agg = summarize_agg(filtered, timeplot_labels[ticker])
         label = 'Selected Mean'
     else:
-        agg_df = None
+        agg = None
         label = None
-    return agg_df, label
+    return agg, label
 
 
 
@@ -1,31 +1,76 @@
 import dash
 from dash import dcc, html, Input, Output
+from flask_caching import Cache
 import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
-import os, sys
+import numpy as np
+import os, sys, json, glob
 
 
 # Make rel_data importable
 THIS_DIR = os.path.dirname(__file__)
 SRC_DIR = os.path.abspath(os.path.join(THIS_DIR, '..', 'src'))
 sys.path.append(SRC_DIR)
-from rel_data import df_maker
+from rel_data_pl import load_csv
+
+
+# Version of the cached frame (columns, dtypes, row order). Bump it whenever
+# load_csv/df_maker output changes so caches from older builds are rebuilt
+CACHE_VERSION = 2
+
+
+def load_df(csv_path):
+    # Processed frames are cached as parquet next to this file, keyed on the
+    # CSV's name, mtime and size so any edit to the CSV forces a rebuild
+    stat = os.stat(csv_path)
+    name = os.path.basename(csv_path)
+    key = f"{name}_v{CACHE_VERSION}_{stat.st_mtime_ns}_{stat.st_size}"
+    cache = os.path.join(THIS_DIR, f".cache_{key}.parquet")
+    if os.path.exists(cache):
+        try:
+            return pd.read_parquet(cache)
+        except Exception as e:
+            # A damaged cache would otherwise fail every start with the same key; rebuild it
+            print(f"Could not read cache {cache}, rebuilding: {e}")
+            try:
+                os.remove(cache)
+            except OSError:
+                pass
+    df = load_csv(csv_path)
+    # Write to a temp file and rename it into place so a crash never leaves a partial cache
+    tmp = f"{cache}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp)
+        os.replace(tmp, cache)
+    except Exception as e:
+        print(f"Could not write cache {cache}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    else:
+        # Remove caches of older versions or earlier edits of the same CSV
+        for old in glob.glob(os.path.join(THIS_DIR, f".cache_{glob.escape(name)}_*.parquet")):
+            if old != cache:
+                try:
+                    os.remove(old)
+                except OSError as e:
+                    print(f"Could not remove old cache {old}: {e}")
+    return df
 
 
 # Load & process data
-data = pd.read_csv(os.path.join(THIS_DIR, '..', 'data', 'oct_data.csv'))
-df = df_maker(data)
+df = load_df(os.path.join(THIS_DIR, '..', 'data', 'oct_data.csv'))
 
 
-# Build shifted datetime for plotting
-df['TimeDT'] = pd.to_datetime(
-    '2000-01-01 ' + df['TimeOfDay'].astype(str),
-    format='%Y-%m-%d %H:%M:%S'
-)
-cutoff = pd.to_datetime('18:00:00', format='%H:%M:%S').time()
-df['TimePlot'] = df['TimeDT'].apply(
-    lambda ts: ts + pd.Timedelta(days=1) if ts.time() < cutoff else ts
-)
+# Build shifted datetime for plotting in int64 nanoseconds: times before the
+# 18:00 open move to the following day
+DAY_NS = 24 * 3600 * 10**9
+CUTOFF_NS = 18 * 3600 * 10**9
+ns = df['TimeOfDay'].to_numpy().astype('timedelta64[ns]').astype(np.int64)
+plot_ns = np.where(ns < CUTOFF_NS, ns + DAY_NS, ns) + np.datetime64('2000-01-01', 'ns').astype(np.int64)
+df['TimePlot'] = pd.to_datetime(plot_ns)
 
 
 # Label columns
@@ -33,18 +78,29 @@ df['DayStr'] = df['TradingDay'].dt.strftime('%Y-%m-%d')
 df['WeekDay'] = df['TradingDay'].dt.day_name()
 df['DayLabel'] = df['DayStr'] + ' - ' + df['WeekDay']
 
+# Categorical labels: isin/groupby/unique run on integer codes instead of strings
+for col in ('WeekDay', 'DayStr', 'DayLabel'):
+    df[col] = df[col].astype('category')
+
 
 # Get date range for calendar
-min_date = pd.to_datetime(df['DayStr']).min()
-max_date = pd.to_datetime(df['DayStr']).max()
+min_date = df['TradingDay'].min()
+max_date = df['TradingDay'].max()
+
+# Trading days as int64 ns; df_maker sorts by TradingDay, so a calendar range is
+# one contiguous slice found by bisection
+TRADING_DAYS_NS = df['TradingDay'].to_numpy().view('i8')
 
-# Get unique weekdays
-unique_weekdays = sorted(df['WeekDay'].unique())
+# Get unique weekdays (categories are already sorted)
+unique_weekdays = list(df['WeekDay'].cat.categories)
 
 
 # Initialize Dash app
 app = dash.Dash(__name__)
 
+# Memoizes built chart JSON per set of callback inputs
+cache = Cache(app.server, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 600})
+
 
 app.layout = html.Div([
     # White Banner with Title (Full Width)
@@ -232,21 +288,63 @@ app.layout = html.Div([
 })
 
 
+# Per-day traces longer than this are min/max downsampled before plotting
+MAX_POINTS_PER_TRACE = 1500
+
+
+def minmax_indices(y, n_out=MAX_POINTS_PER_TRACE):
+    # Positions to keep so each of n_out // 2 buckets retains its min and max,
+    # which preserves spikes; short traces are returned whole
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    edges = np.linspace(0, n, n_out // 2 + 1).astype(int)
+    lo, hi = edges[:-1], edges[1:]
+    # Buckets as rows of a (n_buckets, widest) matrix, NaN-padded past each bucket's end
+    idx = lo[:, None] + np.arange((hi - lo).max())
+    buckets = np.where(idx < hi[:, None], y[np.minimum(idx, n - 1)], np.nan)
+    empty = np.isnan(buckets).all(axis=1)
+    # All-NaN buckets keep their first position; fill them so nanarg* does not raise
+    buckets[empty] = 0.0
+    i_min = lo + np.nanargmin(buckets, axis=1)
+    i_max = lo + np.nanargmax(buckets, axis=1)
+    first = np.where(empty, lo, np.minimum(i_min, i_max))
+    second = np.maximum(i_min, i_max)
+    # Row-major pairs in bucket order; the second slot only when it is a distinct point
+    pairs = np.stack([first, second], axis=1)
+    keep = np.stack([np.ones_like(empty), ~empty & (i_min != i_max)], axis=1)
+    return pairs[keep]
+
+
+def summarize(frame):
+    # Mean/SD curves over TimePlot, plus the overall (mean, SD) for the stats line
+    agg = frame.groupby('TimePlot')['Relative Price'].agg(['mean', 'std'])
+    return agg, (frame['Relative Price'].mean(), frame['Relative Price'].std())
+
+
+# 'total' and 'weekday' aggregates only depend on the static df, so build them once
+TOTAL_AGG, TOTAL_STATS = summarize(df)
+WEEKDAY_AGG, WEEKDAY_STATS = {}, {}
+for wd, group in df.groupby('WeekDay', observed=True):
+    WEEKDAY_AGG[wd], WEEKDAY_STATS[wd] = summarize(group)
+
+
 def get_agg_df(filtered, agg_mode, selected_days):
+    # read-only: returns shared precomputed frames, no copies
     if agg_mode == 'total':
-        agg_df = df.copy()
+        agg, stats = TOTAL_AGG, TOTAL_STATS
         label = 'Total Mean'
     elif agg_mode == 'weekday' and len(selected_days) == 1:
         weekday = filtered['WeekDay'].iloc[0]
-        agg_df = df[df['WeekDay'] == weekday].copy()
+        agg, stats = WEEKDAY_AGG[weekday], WEEKDAY_STATS[weekday]
         label = f'{weekday} Mean'
     elif agg_mode == 'selected':
-        agg_df = filtered.copy()
+        agg, stats = summarize(filtered)
         label = 'Selected Mean'
     else:
-        agg_df = None
+        agg, stats = None, None
         label = None
-    return agg_df, label
+    return agg, stats, label
 
 
 # Callback to toggle between calendar and weekday containers
@@ -262,18 +360,12 @@ def toggle_selection_mode(mode):
         return {'display': 'none'}, {'display': 'block'}
 
 
-# Main chart callback
-@app.callback(
-    [Output('price-chart', 'figure'),
-     Output('stats-output', 'children')],
-    [Input('selection-mode', 'value'),
-     Input('date-picker-start', 'date'),
-     Input('date-picker-end', 'date'),
-     Input('weekday-multi-select', 'value'),
-     Input('agg-toggle', 'value')]
-)
-def update_chart(selection_mode, start_date, end_date, selected_weekdays, agg_mode):
-    filtered = df.copy()
+# Builds the figure and serializes it once; the cached value is the JSON string,
+# which is much cheaper to store and return than the Figure object
+@cache.memoize()
+def build_chart(selection_mode, start_date, end_date, selected_weekdays, agg_mode):
+    # read-only: filtered and the aggregates are slices of the shared df, never mutate them
+    filtered = df
     
     # Filter based on selection mode
     if selection_mode == 'calendar':
@@ -281,11 +373,10 @@ def update_chart(selection_mode, start_date, end_date, selected_weekdays, agg_mo
         if end_date is None:
             end_date = start_date
         
-        selected_date_range = pd.date_range(start=start_date, end=end_date, freq='D')
-        selected_date_strs = selected_date_range.strftime('%Y-%m-%d').tolist()
-        
-        mask = filtered['DayStr'].isin(selected_date_strs)
-        filtered = filtered.loc[mask]
+        # Rows from the first start-date row through the last end-date row
+        lo = np.searchsorted(TRADING_DAYS_NS, pd.Timestamp(start_date).normalize().value, side='left')
+        hi = np.searchsorted(TRADING_DAYS_NS, pd.Timestamp(end_date).normalize().value, side='right')
+        filtered = df.iloc[lo:hi]
         mode_label = "Calendar"
         
     elif selection_mode == 'weekday':
@@ -293,48 +384,47 @@ def update_chart(selection_mode, start_date, end_date, selected_weekdays, agg_mo
         if not selected_weekdays:
             selected_weekdays = []
         
-        mask = filtered['WeekDay'].isin(selected_weekdays)
-        filtered = filtered.loc[mask]
+        mask = df['WeekDay'].isin(selected_weekdays)
+        filtered = df.loc[mask]
         mode_label = f"Weekday ({', '.join(selected_weekdays)})"
     
-    filtered = filtered.sort_values('TimePlot')
+    # df_maker sorts by trading day then time and both filters keep that order
     
     if filtered.empty:
-        return go.Figure(), "No data available for selected criteria"
-
-    # Get unique day labels for this selection
-    selected_days = filtered['DayLabel'].unique()
+        return pio.to_json(go.Figure()), "No data available for selected criteria"
 
-    # Per-day traces
+    # Per-day traces, one groupby pass over the selection
     fig = go.Figure()
-    for label in selected_days:
-        day_df = filtered.query('DayLabel == @label')
-        fig.add_trace(go.Scatter(
-            x=day_df['TimePlot'], y=day_df['Relative Price'],
+    selected_days = []
+    for label, day_df in filtered.groupby('DayLabel', sort=False, observed=True):
+        selected_days.append(label)
+        x, y = day_df['TimePlot'], day_df['Relative Price']
+        if len(day_df) > MAX_POINTS_PER_TRACE:
+            keep = minmax_indices(y.to_numpy(dtype=np.float64))
+            x, y = x.iloc[keep], y.iloc[keep]
+        fig.add_trace(go.Scattergl(
+            x=x, y=y,
             mode='lines', name=label, opacity=0.7
         ))
 
-    # Mean/SD aggregation (only if not 'none')
+    # Mean/SD aggregation (only if not 'none'), computed once for the traces and the stats line
     if agg_mode != 'none':
-        agg_df, mean_label = get_agg_df(filtered, agg_mode, selected_days)
+        agg, stats, mean_label = get_agg_df(filtered, agg_mode, selected_days)
         
-        if agg_df is not None and not agg_df.empty:
-            mean_curve = agg_df.groupby('TimePlot')['Relative Price'].mean().sort_index()
-            sd_curve = agg_df.groupby('TimePlot')['Relative Price'].std().sort_index()
-
+        if agg is not None and not agg.empty:
             # Mean trace
-            fig.add_trace(go.Scatter(
-                x=mean_curve.index, y=mean_curve.values,
+            fig.add_trace(go.Scattergl(
+                x=agg.index, y=agg['mean'].values,
                 mode='lines', name=f'{mean_label}',
                 line=dict(color='black', width=3, dash='dot')
             ))
             # ±1 SD fill
-            fig.add_trace(go.Scatter(
-                x=sd_curve.index, y=mean_curve.values + sd_curve.values,
+            fig.add_trace(go.Scattergl(
+                x=agg.index, y=agg['mean'].values + agg['std'].values,
                 mode='lines', line=dict(width=0), showlegend=False
             ))
-            fig.add_trace(go.Scatter(
-                x=sd_curve.index, y=mean_curve.values - sd_curve.values,
+            fig.add_trace(go.Scattergl(
+                x=agg.index, y=agg['mean'].values - agg['std'].values,
                 mode='lines', fill='tonexty', line=dict(width=0, color='gray'),
                 name=f'{mean_label} ±1SD', opacity=0.3
             ))
@@ -357,10 +447,8 @@ def update_chart(selection_mode, start_date, end_date, selected_weekdays, agg_mo
 
     # Stats description
     if agg_mode != 'none':
-        agg_df, _ = get_agg_df(filtered, agg_mode, selected_days)
-        if agg_df is not None and not agg_df.empty:
-            sel_mean = agg_df['Relative Price'].mean()
-            sel_sd = agg_df['Relative Price'].std()
+        if agg is not None and not agg.empty:
+            sel_mean, sel_sd = stats
             desc = (f"Mode: {agg_mode.title()} | Selection: {mode_label} | Days: {len(selected_days)} | "
                     f"Avg Relative Price: {sel_mean:.4f} | SD: {sel_sd:.4f}")
         else:
@@ -368,7 +456,25 @@ def update_chart(selection_mode, start_date, end_date, selected_weekdays, agg_mo
     else:
         desc = f"Showing {len(selected_days)} individual day(s) — Selection: {mode_label}"
 
-    return fig, desc
+    return pio.to_json(fig), desc
+
+
+# Main chart callback
+@app.callback(
+    [Output('price-chart', 'figure'),
+     Output('stats-output', 'children')],
+    [Input('selection-mode', 'value'),
+     Input('date-picker-start', 'date'),
+     Input('date-picker-end', 'date'),
+     Input('weekday-multi-select', 'value'),
+     Input('agg-toggle', 'value')]
+)
+def update_chart(selection_mode, start_date, end_date, selected_weekdays, agg_mode):
+    # Weekdays arrive as a list; a tuple keeps the memoize key hashable and stable
+    fig_json, desc = build_chart(
+        selection_mode, start_date, end_date, tuple(selected_weekdays or ()), agg_mode
+    )
+    return json.loads(fig_json), desc
 
 
 if __name__ == '__main__':
@@ -0,0 +1,34 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def groupby_mean_std(codes: np.ndarray, values: np.ndarray, n_groups: int):
+    # Per-group mean and sample standard deviation (ddof=1), skipping NaN values.
+    # codes are 0..n_groups-1 group ids, e.g. from pd.factorize
+    count = np.zeros(n_groups, dtype=np.int64)
+    total = np.zeros(n_groups, dtype=np.float64)
+    for i in range(codes.shape[0]):
+        v = values[i]
+        if not np.isnan(v):
+            count[codes[i]] += 1
+            total[codes[i]] += v
+
+    mean = np.full(n_groups, np.nan)
+    for g in range(n_groups):
+        if count[g] > 0:
+            mean[g] = total[g] / count[g]
+
+    # Second sweep over deviations keeps the SD as accurate as pandas' std
+    sq_dev = np.zeros(n_groups, dtype=np.float64)
+    for i in range(codes.shape[0]):
+        v = values[i]
+        if not np.isnan(v):
+            d = v - mean[codes[i]]
+            sq_dev[codes[i]] += d * d
+
+    std = np.full(n_groups, np.nan)
+    for g in range(n_groups):
+        if count[g] > 1:
+            std[g] = np.sqrt(sq_dev[g] / (count[g] - 1))
+    return mean, std
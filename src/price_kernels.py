@@ -0,0 +1,62 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _parse_one(buf: np.ndarray, start: int, stop: int,
+               glyph_cps: np.ndarray, glyph_vals: np.ndarray) -> float:
+    # Parse one UTF-8 price like "104-08¼" from buf[start:stop] as whole + (ticks + frac) / 32.
+    # Ticks are the ASCII digits after the dash, each code point found in glyph_cps adds
+    # its glyph_vals entry, and any other code point is ignored
+    i = start
+    while i < stop and buf[i] in (9, 10, 11, 12, 13, 32):
+        i += 1
+    whole = 0
+    n_digits = 0
+    while i < stop and 48 <= buf[i] <= 57:
+        whole = whole * 10 + (buf[i] - 48)
+        n_digits += 1
+        i += 1
+    while i < stop and buf[i] in (9, 10, 11, 12, 13, 32):
+        i += 1
+    if n_digits == 0 or i >= stop or buf[i] != 45:
+        return np.nan
+    i += 1
+
+    ticks = 0
+    frac = 0.0
+    while i < stop:
+        b = buf[i]
+        if 48 <= b <= 57:
+            ticks = ticks * 10 + (b - 48)
+            i += 1
+            continue
+        # Decode the code point so multi-byte glyphs can be looked up
+        if b < 0x80:
+            cp, width = b, 1
+        elif b >> 5 == 0x6:
+            cp, width = b & 0x1F, 2
+        elif b >> 4 == 0xE:
+            cp, width = b & 0x0F, 3
+        else:
+            cp, width = b & 0x07, 4
+        for k in range(1, width):
+            if i + k < stop:
+                cp = (cp << 6) | (buf[i + k] & 0x3F)
+        for g in range(glyph_cps.shape[0]):
+            if glyph_cps[g] == cp:
+                frac += glyph_vals[g]
+                break
+        i += width
+    return whole + (ticks + frac) / 32
+
+
+@njit(cache=True)
+def parse_prices_nb(buf: np.ndarray, offsets: np.ndarray,
+                    glyph_cps: np.ndarray, glyph_vals: np.ndarray) -> np.ndarray:
+    # Price i is the UTF-8 bytes buf[offsets[i]:offsets[i + 1]]
+    n = offsets.shape[0] - 1
+    out = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        out[i] = _parse_one(buf, offsets[i], offsets[i + 1], glyph_cps, glyph_vals)
+    return out
@@ -1,6 +1,13 @@
+import re
 import pandas as pd
 import numpy as np
-_FRACTION_MAP = {
+from price_kernels import parse_prices_nb
+
+# Let pandas use bottleneck/numexpr for float reductions and elementwise ops
+pd.set_option('compute.use_bottleneck', True)
+pd.set_option('compute.use_numexpr', True)
+
+FRACTION_MAP = {
     "½": 0.5,
     "¼": 0.25,
     "¾": 0.75,
@@ -9,27 +16,54 @@ _FRACTION_MAP = {
     "⅝": 0.625,
     "⅞": 0.875,
 }
-
-def parse_price(s: str) -> float:
-    if pd.isna(s):
-        return float("nan")
-    try:
-        whole_str, frac_str = s.split("-", 1)
-        whole = int(whole_str)
-        ticks_part = "".join(ch for ch in frac_str if ch.isdigit())
-        frac_chars = "".join(ch for ch in frac_str if not ch.isdigit())
-        ticks = int(ticks_part) if ticks_part else 0
-        frac = sum(_FRACTION_MAP.get(ch, 0) for ch in frac_chars)
-        return whole + (ticks + frac) / 32
-    except Exception:
-        return float("nan")
+# Fraction glyphs as code points for the compiled parser
+_GLYPH_CPS = np.array([ord(ch) for ch in FRACTION_MAP], dtype=np.int64)
+_GLYPH_VALS = np.array(list(FRACTION_MAP.values()), dtype=np.float64)
+# What the vectorized parser understands after the dash
+_KNOWN_FRAC = '[0-9' + ''.join(FRACTION_MAP) + ']*'
+
+def parse_prices_fallback(text: pd.Series) -> np.ndarray:
+    # Byte-walking parse of each string with the numba kernel
+    encoded = [x.encode('utf-8') for x in text]
+    buf = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return parse_prices_nb(buf, offsets, _GLYPH_CPS, _GLYPH_VALS)
+
+def parse_prices(s: pd.Series) -> pd.Series:
+    # Prices like "104-08¼" mean 104 + (8 + 1/4) / 32; anything unparseable is NaN.
+    # Prices repeat heavily, so parse each distinct string once and map back by code
+    codes, uniques = pd.factorize(s)
+    text = pd.Series(uniques, dtype=object).astype('string')
+    parts = text.str.partition('-').reindex(columns=range(3)).astype('string')
+    whole_str, sep, frac_str = parts[0], parts[1], parts[2]
+
+    whole = pd.to_numeric(whole_str.where(whole_str.str.fullmatch(r'\s*\d+\s*')), errors='coerce')
+    # Ticks are the digits after the dash, fraction glyphs add their value each time they appear
+    ticks = pd.to_numeric(frac_str.str.replace(r'\D', '', regex=True), errors='coerce').fillna(0)
+    frac = sum(frac_str.str.count(re.escape(ch)) * val for ch, val in FRACTION_MAP.items())
+    price = (whole + (ticks + frac) / 32).where(sep == '-').to_numpy(dtype=np.float64, na_value=np.nan)
+
+    # Strings with other glyphs after the dash (e.g. "112-14+") go through the compiled
+    # parser, which ignores glyphs it does not know
+    unknown = ((sep == '-') & ~frac_str.str.fullmatch(_KNOWN_FRAC).fillna(False)).to_numpy(dtype=bool)
+    if unknown.any():
+        price[unknown] = parse_prices_fallback(text[unknown])
+
+    # Missing inputs factorize to code -1, which picks the trailing NaN
+    unique_prices = np.append(price, np.nan)
+    return pd.Series(unique_prices[codes], index=s.index, name='Price')
 
 def clean_data(df:pd.DataFrame) -> pd.DataFrame:
     tmp = df.copy()
-    tmp['DateTime'] = pd.to_datetime(tmp['Date'])
+    # Callers can hand over Date already parsed (read_csv parse_dates)
+    if pd.api.types.is_datetime64_dtype(tmp['Date']):
+        tmp['DateTime'] = tmp['Date']
+    else:
+        tmp['DateTime'] = pd.to_datetime(tmp['Date'])
     excel_epoch = pd.Timestamp("1899-12-30")
     tmp['Date']  = (tmp['DateTime'] - excel_epoch).dt.total_seconds() / 86400
-    tmp['Price'] = tmp['Lst Trd/Lst Prxx'].map(parse_price)
+    tmp['Price'] = parse_prices(tmp['Lst Trd/Lst Prxx'])
     # Return Date (serial) so trading_day will find tmp['Date']
     return tmp[['Date','Price']]
     
@@ -39,12 +73,11 @@ def time(df: pd.DataFrame) -> pd.Series:
     # Extract fractional days and convert to timedelta
     frac = (date % 1).round(6)
     td = pd.to_timedelta(frac, unit='D')
-    # Round to nearest minute
-    td_rounded = td.dt.round('min')
-    # Add to a dummy midnight timestamp and extract the time component
-    dummy = pd.Timestamp('2000-01-01')
-    times = (dummy + td_rounded).dt.time
-    return pd.Series(times, index=df.index, name='TimeOfDay')
+    # Round to nearest minute, wrapping 24:00 back to midnight
+    td_rounded = td.dt.round('min') % pd.Timedelta(days=1)
+    # Time of day stays a timedelta64[ns] offset from midnight; building datetime.time
+    # objects per row (.dt.time) is slow, so format only where a display string is needed
+    return pd.Series(td_rounded, index=df.index, name='TimeOfDay')
 
 def trading_day(df: pd.DataFrame) -> pd.Series:
     date = pd.to_numeric(df['Date'], errors='coerce')
@@ -67,7 +100,8 @@ def relative_price(df: pd.DataFrame,
     # Compute the opening price per trading day (first row in each group)
     day_open = df.groupby(day_col)[price_col].transform('first')
     # Subtract the open price from each price
-    rel = df[price_col] - day_open
+    # Keep float64 so the downstream groupby reductions stay on the numeric fast path
+    rel = (df[price_col] - day_open).astype('float64', copy=False)
     # Return as a named Series
     return pd.Series(rel, index=df.index, name='RelPrice')
 
@@ -92,69 +126,56 @@ def fill_trading_gaps(
     xls_epoch = pd.Timestamp('1899-12-30')
 
     df = df.copy()
-    df[date_col] = pd.to_numeric(df[date_col], errors='coerce')
-    df[price_col] = pd.to_numeric(df[price_col], errors='coerce')
-    df[trading_day_col] = pd.to_datetime(df[trading_day_col], errors='coerce')
+    # Only coerce what is not already in the contracted dtype (df_maker's output is)
+    if not pd.api.types.is_float_dtype(df[date_col]):
+        df[date_col] = pd.to_numeric(df[date_col], errors='coerce')
+    if not pd.api.types.is_float_dtype(df[price_col]):
+        df[price_col] = pd.to_numeric(df[price_col], errors='coerce')
+    if not pd.api.types.is_datetime64_dtype(df[trading_day_col]):
+        df[trading_day_col] = pd.to_datetime(df[trading_day_col], errors='coerce')
 
     # Keep one tick per timestamp
     df = df.drop_duplicates(subset=[date_col], keep='first')
 
-    unique_days = sorted(df[trading_day_col].dropna().unique())
-    all_filled = []
-
-    for td in unique_days:
-        td = pd.Timestamp(td)
-        start_ts = td + pd.Timedelta(hours=18)
-        end_ts = td + pd.Timedelta(days=1, hours=17)
-
-        day = df[df[trading_day_col] == td].copy()
-        if day.empty:
-            continue
-
-        # Build a real timestamp from Excel serial for indexing
-        idx_ts = xls_epoch + pd.to_timedelta(day[date_col], unit='D')
-        day = day.assign(_ts=idx_ts).set_index('_ts').sort_index()
-
-        # Complete 5 minute grid
-        grid = pd.date_range(start=start_ts, end=end_ts, freq='5min')
-        day = day.reindex(grid)
-
-        # Price fill. Require at least one real tick for the day
-        if not day[price_col].notna().any():
-            continue
-        day[price_col] = day[price_col].ffill().bfill()
-
-        # TradingDay constant over the window
-        day[trading_day_col] = td
-
-        # Recompute Excel serial Date from the index
-        day[date_col] = (day.index - xls_epoch) / pd.Timedelta(days=1)
-
-        # If TimeOfDay exists in input, recompute from the grid to avoid NaNs
-        if 'TimeOfDay' in df.columns:
-            day['TimeOfDay'] = (pd.Timestamp('2000-01-01') + (day.index - day.index.normalize())).time
-
-        # For any other existing columns, forward fill then backfill to guarantee no NaNs
-        # Do not touch Date or TradingDay or Price which are already set
-        base_keep = {date_col, price_col, trading_day_col, 'TimeOfDay'}
-        extra_cols = [c for c in df.columns if c not in base_keep and c in day.columns]
-        if extra_cols:
-            day[extra_cols] = day[extra_cols].ffill().bfill()
-
-        # Preserve only columns that existed on input
-        existing_cols = [c for c in df.columns if c in day.columns]
-        all_filled.append(day[existing_cols])
-
-    if not all_filled:
-        return pd.DataFrame(columns=[c for c in df.columns])
-
-    out = pd.concat(all_filled, axis=0, ignore_index=True)
-
-    # Final guarantees
-    out[trading_day_col] = pd.to_datetime(out[trading_day_col])
-    out[date_col] = pd.to_numeric(out[date_col], errors='coerce')
-    if price_col in out:
-        out[price_col] = pd.to_numeric(out[price_col], errors='coerce').ffill().bfill()
+    # Build a real timestamp from Excel serial for indexing
+    df['_ts'] = xls_epoch + pd.to_timedelta(df[date_col], unit='D')
+
+    # Complete 5 minute grid for every trading day (18:00 through 17:00 next day),
+    # built as one (TradingDay, timestamp) index so the whole frame reindexes at once
+    unique_days = pd.DatetimeIndex(sorted(df[trading_day_col].dropna().unique()))
+    offsets = pd.timedelta_range(start='18h', end='41h', freq='5min')
+    grid = pd.MultiIndex.from_arrays(
+        [unique_days.repeat(len(offsets)), np.add.outer(unique_days, offsets).ravel()],
+        names=[trading_day_col, '_ts']
+    )
+    out = df.dropna(subset=[trading_day_col]).set_index([trading_day_col, '_ts']).reindex(grid)
+
+    # Price fill. Require at least one real tick for the day
+    ticks_per_day = out.groupby(level=trading_day_col)[price_col].transform('count')
+    out = out[ticks_per_day.to_numpy() > 0]
+    if out.empty:
+        return pd.DataFrame(columns=[c for c in df.columns if c != '_ts'])
+
+    # For price and any other existing columns, forward fill then backfill within each day
+    # Date, TradingDay and TimeOfDay are rebuilt from the grid below
+    base_keep = {date_col, trading_day_col, 'TimeOfDay', '_ts'}
+    fill_cols = [c for c in df.columns if c not in base_keep]
+    out[fill_cols] = out.groupby(level=trading_day_col)[fill_cols].ffill()
+    out[fill_cols] = out.groupby(level=trading_day_col)[fill_cols].bfill()
+
+    out = out.reset_index()
+    # Recompute Excel serial Date from the grid timestamps
+    out[date_col] = (out['_ts'] - xls_epoch) / pd.Timedelta(days=1)
+
+    # If TimeOfDay exists in input, recompute from the grid to avoid NaNs
+    if 'TimeOfDay' in df.columns:
+        out['TimeOfDay'] = out['_ts'] - out['_ts'].dt.normalize()
+
+    # Preserve only columns that existed on input
+    out = out[[c for c in df.columns if c != '_ts']]
+
+    # TradingDay and Date come straight off the datetime grid and Price was filled per day
+    # over days that all have a tick, so no further coercion or price fill is needed here
 
     # As a safety net, fill any leftover gaps in non-key columns
     non_key = [c for c in out.columns if c not in {date_col, price_col, trading_day_col}]
@@ -176,9 +197,8 @@ def df_maker(df: pd.DataFrame) -> pd.DataFrame:
     out['WeekDay'] = week_day(out, day_col='TradingDay')
     
     out['Relative Price'] = relative_price(out, day_col='TradingDay', price_col='Price')
+    # Weekday SD/mean are not materialized here; call wkday_sd/wkday_mean on the result if needed
     
-    out['DaySD'] = wkday_sd(out)
-
-    out['DayMean'] = wkday_mean(out)
-    
-    return out
+    # Sort once here so each trading day is a contiguous, time-ordered block and
+    # callers can slice or mask without re-sorting
+    return out.sort_values(['TradingDay', 'Date']).reset_index(drop=True)
@@ -0,0 +1,90 @@
+import pandas as pd
+from rel_data import FRACTION_MAP, df_maker
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional, rel_data.df_maker builds the same frame
+    pl = None
+else:
+    # polars 0.20+ has a common PolarsError base; the pinned 0.19 raises these directly
+    POLARS_ERRORS = (pl.PolarsError,) if hasattr(pl, 'PolarsError') else (
+        pl.ArrowError, pl.ColumnNotFoundError, pl.ComputeError, pl.DuplicateError,
+        pl.InvalidOperationError, pl.NoDataError, pl.OutOfBoundsError, pl.PolarsPanicError,
+        pl.SchemaError, pl.SchemaFieldNotFoundError, pl.ShapeError, pl.StructFieldNotFoundError,
+    )
+
+PRICE_COL = 'Lst Trd/Lst Prxx'
+# Timestamp layout of the exported CSVs, e.g. "9/22/2025 18:00"
+DATE_FORMAT = '%m/%d/%Y %H:%M'
+_EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+_DAY_NS = 86_400_000_000_000
+_MINUTE_NS = 60_000_000_000
+
+
+def _price_expr(col: str) -> 'pl.Expr':
+    # Same rules as rel_data.parse_prices: "104-08¼" is 104 + (8 + 1/4) / 32
+    parts = pl.col(col).str.splitn('-', 2)
+    whole_str = parts.struct.field('field_0')
+    frac_str = parts.struct.field('field_1')
+    whole = (
+        pl.when(whole_str.str.contains(r'^\s*\d+\s*$'))
+        .then(whole_str.str.strip_chars().cast(pl.Float64, strict=False))
+    )
+    ticks = frac_str.str.replace_all(r'\D', '').cast(pl.Float64, strict=False).fill_null(0)
+    frac = pl.lit(0.0)
+    for ch, val in FRACTION_MAP.items():
+        frac = frac + frac_str.str.count_matches(ch, literal=True) * val
+    return whole + (ticks + frac) / 32
+
+
+def df_maker_pl(csv_path: str) -> pd.DataFrame:
+    # Polars port of read_csv + rel_data.df_maker, returning the same pandas frame
+    date = pl.col('Date')
+    frac_day = (date % 1).round(6)
+    trading_serial = (
+        pl.when(frac_day < 0.75)
+        .then(date.cast(pl.Int64) - 1)
+        .otherwise(date.cast(pl.Int64))
+    )
+    # Fraction of day to the nearest minute, wrapping 24:00 back to midnight
+    time_ns = ((frac_day * _DAY_NS / _MINUTE_NS).round(0).cast(pl.Int64) * _MINUTE_NS) % _DAY_NS
+
+    out = (
+        # Some exports end every line with a stray comma (fvz5.csv)
+        pl.scan_csv(csv_path, dtypes={PRICE_COL: pl.Utf8}, truncate_ragged_lines=True)
+        .select(
+            pl.col('Date').str.strptime(pl.Datetime('ns'), DATE_FORMAT).alias('DateTime'),
+            _price_expr(PRICE_COL).alias('Price'),
+        )
+        .with_columns(
+            ((pl.col('DateTime').cast(pl.Int64) - _EXCEL_EPOCH.value) / 1_000_000_000 / 86400).alias('Date')
+        )
+        .with_columns(
+            (pl.lit(_EXCEL_EPOCH) + pl.duration(days=trading_serial)).cast(pl.Datetime('ns')).alias('TradingDay'),
+            time_ns.cast(pl.Duration('ns')).alias('TimeOfDay'),
+        )
+        .with_columns(
+            pl.col('TradingDay').dt.strftime('%A').alias('WeekDay'),
+            # Open is the day's first non-missing price, as with groupby().transform('first')
+            (pl.col('Price') - pl.col('Price').drop_nulls().first().over('TradingDay')).alias('Relative Price'),
+        )
+        .select('Date', 'Price', 'TradingDay', 'TimeOfDay', 'WeekDay', 'Relative Price')
+        .sort(['TradingDay', 'Date'], maintain_order=True)
+        .collect()
+    )
+    return out.to_pandas()
+
+
+def load_csv(csv_path: str) -> pd.DataFrame:
+    # df_maker output for a price CSV, through polars when it is installed
+    if pl is not None:
+        try:
+            return df_maker_pl(csv_path)
+        except POLARS_ERRORS as e:
+            # e.g. timestamps not in DATE_FORMAT, which pandas can still infer, or a schema polars rejects
+            print(f"polars ingest failed for {csv_path}, using pandas: {str(e).splitlines()[0]}")
+    data = pd.read_csv(
+        csv_path, encoding='utf-8', usecols=['Date', PRICE_COL],
+        dtype={PRICE_COL: 'string'}, parse_dates=['Date']
+    )
+    return df_maker(data)